@@ -1,23 +1,97 @@
 #!/usr/bin/env python3
 import os
 import sys
+import codecs
+import functools
 import re
 import json
 import requests
+from requests.adapters import HTTPAdapter
 import subprocess
+import signal
+import shutil
+import select
+import sqlite3
 from pathlib import Path
 from urllib.parse import quote
 import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
+from spotipy.oauth2 import SpotifyClientCredentials, SpotifyOauthError
 import mutagen
 from mutagen.id3 import ID3, TPE1, TIT2, TALB, TCON, TYER, APIC, TRCK, error
 from mutagen.mp3 import MP3
 import argparse
-from typing import List, Dict, Optional
+import threading
+import queue
+import uuid
+from typing import Iterable, Iterator, List, Dict, Optional, Union
 import time
 
+# orjson is optional; when installed it (de)serializes cached metadata blobs several times faster.
+# Both parsers accept the str or bytes rows either one wrote.
+try:
+    import orjson
+    json_dumps, json_loads = orjson.dumps, orjson.loads
+except ImportError:
+    json_dumps, json_loads = json.dumps, json.loads
+
+# Errors a Spotify metadata lookup can hit: API and token errors (SpotifyOauthError is not a
+# SpotifyException; the client-credentials token is fetched lazily on the first call), network
+# failures, and unexpected payload shapes. Cache failures are handled in cache_get/cache_put
+SPOTIFY_LOOKUP_ERRORS = (
+    spotipy.SpotifyException, SpotifyOauthError, requests.RequestException,
+    KeyError, IndexError, TypeError
+)
+
+# Spotify metadata cache: entries expire after a day, oldest rows are evicted past the cap
+META_CACHE_TTL = 24 * 60 * 60
+META_CACHE_MAX_ROWS = 3000
+
+# Filename and matching helpers run for every track, so build their tables/patterns once
+INVALID_FILENAME_CHARS = str.maketrans('', '', '<>:"/\\|?*')
+SEPARATOR_RE = re.compile(r'[\s\-_]+')
+PUNCTUATION_RE = re.compile(r'[^\w\s]')
+
+# Resource type and ID of an open.spotify.com link (optionally /intl-xx/, /embed/ and the legacy
+# /user/<name>/ playlist prefix) or a spotify: URI (including spotify:user:<name>:playlist:<id>)
+SPOTIFY_URL_RE = re.compile(
+    r'(?:open\.spotify\.com/(?:intl-[\w-]+/)?(?:embed/)?(?:user/[^/]+/(?=playlist/))?'
+    r'|^spotify:(?:user:[^:]+:(?=playlist:))?)(track|album|playlist)[/:]([A-Za-z0-9]+)'
+)
+
+@functools.lru_cache(maxsize=1)
+def spotdl_present() -> bool:
+    """Check for the spotdl executable on PATH; cached, so repeated checks cost nothing"""
+    return shutil.which("spotdl") is not None
+
+class RateLimitedPrinter:
+    """Collect subprocess output lines and write them to stdout in batches, at most every `interval` seconds"""
+    def __init__(self, lock: threading.Lock, interval: float = 0.1):
+        self.lock = lock
+        self.interval = interval
+        self.pending: List[str] = []
+        self.last_emit = 0.0
+
+    def add(self, lines: List[str]):
+        """Queue non-blank lines and write them out if the interval has passed"""
+        for line in lines:
+            line = line.rstrip()
+            if line:
+                self.pending.append(line)
+        if self.pending and time.monotonic() - self.last_emit >= self.interval:
+            self.flush()
+
+    def flush(self):
+        """Write every queued line with a single write/flush"""
+        if not self.pending:
+            return
+        with self.lock:
+            sys.stdout.write("\n".join(self.pending) + "\n")
+            sys.stdout.flush()
+        self.pending.clear()
+        self.last_emit = time.monotonic()
+
 class AdvancedSpotifyDownloader:
-    def __init__(self):
+    def __init__(self, jobs: int = 4, refresh_meta: bool = False):
         # Public Spotify API credentials (these are sample credentials)
         self.spotify_client_id = "5f573c9620494bae87890c0f08a60293"
         self.spotify_client_secret = "212476d9b0f3472eaa762d90b19b0ba8"
@@ -27,6 +101,43 @@ class AdvancedSpotifyDownloader:
         self.output_dir = script_dir / "Spotify Downloads"
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
+        # Number of URLs from a --file batch downloaded in parallel (spotdl keeps its own
+        # --threads default within each album/playlist); the lock keeps output from concurrent jobs readable
+        self.jobs = max(1, jobs)
+        self.print_lock = threading.Lock()
+        # Running spotdl processes, so an interrupt can stop the ones started by worker threads
+        self.active_procs = set()
+        self.procs_lock = threading.Lock()
+        self.stopping = threading.Event()
+        
+        # spotdl options are the same for every download, so build them once
+        # Let yt-dlp fetch fragmented streams in parallel, and hand off to aria2c when it is installed
+        ytdlp_args = "--concurrent-fragments 8"
+        if shutil.which("aria2c"):
+            ytdlp_args += ' --downloader aria2c --downloader-args "aria2c:-x 16 -s 16 -k 1M"'
+        # Fixed bitrate parameter - use '320k' instead of '320'
+        self.spotdl_options = (
+            "--format", "mp3", "--bitrate", "320k", "--audio", "youtube-music",
+            "--yt-dlp-args", ytdlp_args
+        )
+        # Force spotdl's piped output to UTF-8 to match the decoder in download_with_spotdl;
+        # otherwise Windows writes the locale code page (e.g. cp1252) and non-ASCII names get
+        # mangled, or spotdl fails on characters that code page can't encode
+        self.spotdl_env = {**os.environ, "PYTHONIOENCODING": "utf-8"}
+        
+        # On-disk cache of Spotify metadata so retries and re-runs skip the API round trips
+        self.refresh_meta = refresh_meta
+        self.cache_lock = threading.Lock()
+        self.cache = sqlite3.connect(str(self.output_dir / ".meta_cache.db"), check_same_thread=False)
+        self.cache.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, json BLOB, ts INTEGER)")
+        self.cache.commit()
+        
+        # Keep-alive session for cover art so every track doesn't pay a new TCP/TLS handshake
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.jobs, pool_maxsize=self.jobs)
+        self.http.mount("https://", adapter)
+        self.http.mount("http://", adapter)
+        
         # Check if spotdl is installed
         if not self.check_spotdl_installed():
             print("[*] spotdl is not installed. Please install it with: pip install spotdl")
@@ -47,12 +158,46 @@ class AdvancedSpotifyDownloader:
     
     def check_spotdl_installed(self) -> bool:
         """Check if spotdl is installed and available"""
+        # A PATH lookup instead of `spotdl --version`, which starts a whole Python interpreter
+        return spotdl_present()
+    
+    def cache_get(self, key: str) -> Optional[Dict]:
+        """Return cached metadata for key, or None if missing, stale, unreadable, or refresh was requested"""
+        if self.refresh_meta:
+            return None
         try:
-            subprocess.run(["spotdl", "--version"], 
-                          capture_output=True, check=True, text=True)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+            with self.cache_lock:
+                row = self.cache.execute("SELECT json, ts FROM meta WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            # e.g. "database is locked" while the other script writes the shared cache
+            return None
+        if row and time.time() - row[1] < META_CACHE_TTL:
+            return json_loads(row[0])
+        return None
+
+    def cache_put(self, key: str, info: Dict):
+        """Store metadata for key and evict the oldest entries beyond the cache cap (best effort)"""
+        with self.cache_lock:
+            try:
+                self.cache.execute(
+                    "INSERT OR REPLACE INTO meta (key, json, ts) VALUES (?, ?, ?)",
+                    (key, json_dumps(info), int(time.time()))
+                )
+                self.cache.execute(
+                    "DELETE FROM meta WHERE key IN (SELECT key FROM meta ORDER BY ts DESC LIMIT -1 OFFSET ?)",
+                    (META_CACHE_MAX_ROWS,)
+                )
+                self.cache.commit()
+            except sqlite3.Error:
+                # Skipping the write only costs a refetch later; don't leave a half-done transaction open
+                self.cache.rollback()
+
+    def clear_cache(self):
+        """Drop every cached metadata entry"""
+        with self.cache_lock:
+            self.cache.execute("DELETE FROM meta")
+            self.cache.commit()
+        print("[*] Metadata cache cleared")
     
     def clear_screen(self):
         """Clear the screen but keep the header"""
@@ -81,23 +226,28 @@ class AdvancedSpotifyDownloader:
     
     def sanitize_filename(self, name: str) -> str:
         """Remove invalid characters from filename"""
-        return re.sub(r'[<>:"/\\|?*]', '', name)
+        return name.translate(INVALID_FILENAME_CHARS)
 
     def normalize(self, s: str) -> str:
         """Simple normalization for matching"""
         s = s.lower()
-        s = re.sub(r'[\s\-_]+', ' ', s)
-        s = re.sub(r'[^\w\s]', '', s)
+        s = SEPARATOR_RE.sub(' ', s)
+        s = PUNCTUATION_RE.sub('', s)
         return s.strip()
+
+    def list_audio_files(self, directory: Path) -> List[Path]:
+        """List MP3 files in directory with a single scandir pass (no pattern matching)"""
+        with os.scandir(directory) as entries:
+            return [Path(entry.path) for entry in entries if entry.name.endswith('.mp3') and entry.is_file()]
     
     def download_image(self, url: Optional[str]) -> Optional[bytes]:
         if not url:
             return None
         try:
-            resp = requests.get(url, timeout=10)
+            resp = self.http.get(url, timeout=10)
             if resp.status_code == 200:
                 return resp.content
-        except Exception:
+        except requests.RequestException:
             pass
         return None
 
@@ -140,26 +290,32 @@ class AdvancedSpotifyDownloader:
             
             audio.save()
             print(f"[*] MP3 metadata applied: {file_path.name}")
-        except Exception as e:
+        except (mutagen.MutagenError, OSError) as e:
             print(f"[*] Error applying MP3 metadata to {file_path.name}: {e}")
 
     def sync_track_metadata(self, track_info: Dict, directory: Path):
         """Find downloaded MP3(s) for a single track and apply Spotify metadata."""
         cover_bytes = self.download_image(track_info.get('cover_url'))
-        candidates = list(directory.glob("*.mp3"))
-        if not candidates:
-            print("[*] No MP3 files found to tag.")
-            return
+        new_name = f"{self.sanitize_filename(track_info['artists'])} - {self.sanitize_filename(track_info['title'])}.mp3"
+        new_path = directory / new_name
 
-        target_norm = self.normalize(track_info['title'])
-        best = None
-        best_score = 0
-        for f in candidates:
-            name_norm = self.normalize(f.stem)
-            score = 0
-            if target_norm in name_norm or name_norm in target_norm:
-                score = 100
-            else:
+        # spotdl normally writes "Artist - Title.mp3" directly; only scan the directory if it didn't
+        best = new_path if new_path.exists() else None
+        if best is None:
+            candidates = self.list_audio_files(directory)
+            if not candidates:
+                print("[*] No MP3 files found to tag.")
+                return
+
+            target_norm = self.normalize(track_info['title'])
+            best_score = 0
+            for f in candidates:
+                name_norm = self.normalize(f.stem)
+                score = 0
+                if target_norm in name_norm or name_norm in target_norm:
+                    # a title match is the best possible score, no need to open the remaining files
+                    best = f
+                    break
                 # check by duration similarity
                 try:
                     audio = MP3(f)
@@ -167,11 +323,11 @@ class AdvancedSpotifyDownloader:
                     target_len = int(track_info.get('duration_ms', 0) / 1000)
                     if abs(length - target_len) <= 3:
                         score = 50
-                except Exception:
+                except (mutagen.MutagenError, OSError):
                     pass
-            if score > best_score:
-                best_score = score
-                best = f
+                if score > best_score:
+                    best_score = score
+                    best = f
 
         if best:
             meta = {
@@ -182,8 +338,6 @@ class AdvancedSpotifyDownloader:
                 'release_date': track_info.get('release_date')
             }
             # Optionally rename file to "Artist - Title.mp3" (sanitized)
-            new_name = f"{self.sanitize_filename(track_info['artists'])} - {self.sanitize_filename(track_info['title'])}.mp3"
-            new_path = directory / new_name
             try:
                 if best != new_path:
                     counter = 1
@@ -194,7 +348,7 @@ class AdvancedSpotifyDownloader:
                         counter += 1
                     best.rename(candidate_new)
                     best = candidate_new
-            except Exception as e:
+            except OSError as e:
                 print(f"[*] Could not rename file: {e}")
 
             self.apply_metadata_to_mp3(best, meta, cover_bytes)
@@ -204,7 +358,7 @@ class AdvancedSpotifyDownloader:
     def sync_album_metadata(self, album_info: Dict, directory: Path):
         """Match MP3 files in directory to album tracks and apply Spotify metadata."""
         cover_bytes = self.download_image(album_info.get('cover_url'))
-        files = list(directory.glob("*.mp3"))
+        files = self.list_audio_files(directory)
         if not files:
             print("[*] No MP3 files found in album directory.")
             return
@@ -217,7 +371,7 @@ class AdvancedSpotifyDownloader:
             try:
                 audio = MP3(f)
                 length = int(audio.info.length)
-            except Exception:
+            except (mutagen.MutagenError, OSError):
                 pass
             file_data.append({'path': f, 'norm': norm, 'length': length, 'used': False})
 
@@ -263,23 +417,31 @@ class AdvancedSpotifyDownloader:
                             counter += 1
                         best['path'].rename(candidate_new)
                         best['path'] = candidate_new
-                except Exception as e:
+                except OSError as e:
                     print(f"[*] Could not rename file {best['path'].name}: {e}")
                 self.apply_metadata_to_mp3(best['path'], meta, cover_bytes)
                 best['used'] = True
             else:
                 print(f"[*] No good match for track: {track['title']}")
 
-    def get_track_info(self, track_url: str) -> Optional[Dict]:
+    def spotify_id(self, url: str) -> str:
+        """Extract the track/album/playlist ID from a Spotify link or URI"""
+        match = SPOTIFY_URL_RE.search(url)
+        return match.group(2) if match else url.split('/')[-1].split('?')[0]
+
+    def get_track_info(self, track_url: str, track_id: Optional[str] = None) -> Optional[Dict]:
         """Get track information from Spotify"""
         try:
-            track_id = track_url.split('/')[-1].split('?')[0]
+            track_id = track_id or self.spotify_id(track_url)
+            cached = self.cache_get(f"track:{track_id}")
+            if cached:
+                return cached
             track = self.sp.track(track_id)
             
             # Format artists as comma-separated list
             artists = ", ".join([artist['name'] for artist in track['artists']])
             
-            return {
+            track_info = {
                 'id': track['id'],
                 'title': track['name'],
                 'artists': artists,
@@ -289,14 +451,19 @@ class AdvancedSpotifyDownloader:
                 'duration_ms': track['duration_ms'],
                 'cover_url': track['album']['images'][0]['url'] if track['album']['images'] else None
             }
-        except Exception as e:
+            self.cache_put(f"track:{track_id}", track_info)
+            return track_info
+        except SPOTIFY_LOOKUP_ERRORS as e:
             print(f"[*] Error getting track info: {e}")
             return None
     
-    def get_album_info(self, album_url: str) -> Optional[Dict]:
+    def get_album_info(self, album_url: str, album_id: Optional[str] = None) -> Optional[Dict]:
         """Get album information from Spotify"""
         try:
-            album_id = album_url.split('/')[-1].split('?')[0]
+            album_id = album_id or self.spotify_id(album_url)
+            cached = self.cache_get(f"album:{album_id}")
+            if cached:
+                return cached
             album = self.sp.album(album_id)
             
             # Get all tracks from the album
@@ -328,15 +495,19 @@ class AdvancedSpotifyDownloader:
                     'duration_ms': track['duration_ms']
                 })
             
+            self.cache_put(f"album:{album_id}", album_info)
             return album_info
-        except Exception as e:
+        except SPOTIFY_LOOKUP_ERRORS as e:
             print(f"[*] Error getting album info: {e}")
             return None
 
-    def get_playlist_info(self, playlist_url: str) -> Optional[Dict]:
+    def get_playlist_info(self, playlist_url: str, playlist_id: Optional[str] = None) -> Optional[Dict]:
         """Get playlist information from Spotify"""
         try:
-            playlist_id = playlist_url.split('/')[-1].split('?')[0]
+            playlist_id = playlist_id or self.spotify_id(playlist_url)
+            cached = self.cache_get(f"playlist:{playlist_id}")
+            if cached:
+                return cached
             playlist = self.sp.playlist(playlist_id)
             
             # Get all tracks from the playlist
@@ -373,44 +544,100 @@ class AdvancedSpotifyDownloader:
                         'cover_url': track['album']['images'][0]['url'] if track['album']['images'] else None
                     })
             
+            self.cache_put(f"playlist:{playlist_id}", playlist_info)
             return playlist_info
-        except Exception as e:
+        except SPOTIFY_LOOKUP_ERRORS as e:
             print(f"[*] Error getting playlist info: {e}")
             return None
     
-    def download_with_spotdl(self, url: str, output_path: Path, timeout: int = 900) -> bool:
-        """Download audio using spotdl while streaming stdout/stderr so progress is visible."""
+    def download_with_spotdl(self, urls: Union[str, List[str]], output_path: Path, timeout: int = 900) -> bool:
+        """Download one or more URLs in a single spotdl process, streaming output so progress is visible."""
+        if isinstance(urls, str):
+            urls = [urls]
+        if self.stopping.is_set():
+            return False
         try:
-            original_cwd = os.getcwd()
-            os.chdir(output_path)
-
             # Use Popen to stream output so user can see progress
-            # Fixed bitrate parameter - use '320k' instead of '320'
             proc = subprocess.Popen(
-                ["spotdl", url, "--format", "mp3", "--bitrate", "320k", "--audio", "youtube-music"],
+                ("spotdl", *urls, *self.spotdl_options),
+                cwd=output_path,  # per-process cwd; os.chdir would race between worker threads
+                env=self.spotdl_env,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
+                # Own process group on POSIX so a timeout can kill spotdl's children too
+                start_new_session=(os.name != 'nt')
             )
+            # Register and re-check under the lock: stop_downloads() may have taken its snapshot
+            # between the check above and Popen, and would never kill this process
+            with self.procs_lock:
+                stopping = self.stopping.is_set()
+                if not stopping:
+                    self.active_procs.add(proc)
+            if stopping:
+                self.kill_process_tree(proc)
+                proc.stdout.close()
+                proc.wait()
+                return False
+
+            # A watchdog kills the spotdl process tree once the timeout passes; the read loop
+            # notices on its next wake-up instead of checking the clock on every chunk
+            timed_out = threading.Event()
+
+            def on_timeout():
+                timed_out.set()
+                self.kill_process_tree(proc)
+
+            watchdog = threading.Timer(timeout, on_timeout)
+            watchdog.daemon = True
+            watchdog.start()
 
-            start = time.time()
-            # Read lines as they arrive
-            if proc.stdout:
-                for line in proc.stdout:
-                    line = line.rstrip()
-                    if line:
-                        print(line)
-                    # Optional: break if too long
-                    if time.time() - start > timeout:
-                        proc.kill()
-                        print("[*] Download timed out!")
-                        os.chdir(original_cwd)
-                        return False
-
-            proc.wait()
-            os.chdir(original_cwd)
+            # Read output in chunks; select() lets buffered output be flushed while spotdl is silent.
+            # Windows cannot select() on pipes, so it falls back to blocking reads.
+            fd = proc.stdout.fileno()
+            use_select = os.name != 'nt'
+            if use_select:
+                os.set_blocking(fd, False)
+            # Decode whole chunks and split with str.splitlines(), which also breaks on the bare '\r'
+            # spotdl/yt-dlp use to redraw progress; a trailing partial line is carried over
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            pending = ''
+            # Progress redraws arrive many times per second; batch them instead of a tty write per line
+            printer = RateLimitedPrinter(self.print_lock)
+            try:
+                while not timed_out.is_set():
+                    if use_select and not select.select([fd], [], [], 0.5)[0]:
+                        printer.flush()  # spotdl went quiet, don't hold back what it already printed
+                        continue
+                    try:
+                        chunk = os.read(fd, 4096)
+                    except BlockingIOError:
+                        continue
+                    if not chunk:
+                        break
+                    text = pending + decoder.decode(chunk)
+                    lines = text.splitlines()
+                    pending = lines.pop() if text and text[-1] not in '\r\n' else ''
+                    printer.add(lines)
+                    if not use_select:
+                        # No select() tick on Windows to flush during a silence, and the next blocking
+                        # read may not return for a long time; write each chunk's lines out now
+                        printer.flush()
+                printer.add([pending + decoder.decode(b'', final=True)])
+                printer.flush()
+                proc.wait()
+            except BaseException:
+                # Don't leave spotdl running if reading was interrupted (e.g. Ctrl+C)
+                self.kill_process_tree(proc)
+                raise
+            finally:
+                watchdog.cancel()
+                proc.stdout.close()
+                with self.procs_lock:
+                    self.active_procs.discard(proc)
+
+            if timed_out.is_set():
+                print("[*] Download timed out!")
+                return False
 
             if proc.returncode == 0:
                 return True
@@ -418,18 +645,45 @@ class AdvancedSpotifyDownloader:
                 print(f"[!] spotdl exited with code: {proc.returncode}")
                 return False
 
-        except Exception as e:
+        except OSError as e:
             print(f"[*] Error downloading with spotdl: {e}")
-            try:
-                os.chdir(original_cwd)
-            except Exception:
-                pass
             return False
 
-    def download_track(self, track_url: str):
+    def kill_process_tree(self, proc: subprocess.Popen):
+        """Kill spotdl and any children it started (aria2c/ffmpeg can inherit its output pipe)"""
+        try:
+            if os.name == 'nt':
+                subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)], capture_output=True)
+            else:
+                os.killpg(proc.pid, signal.SIGKILL)
+        except OSError:
+            proc.kill()
+
+    def stop_downloads(self):
+        """Kill every running spotdl process and refuse to start new ones"""
+        with self.procs_lock:
+            self.stopping.set()
+            procs = list(self.active_procs)
+        for proc in procs:
+            self.kill_process_tree(proc)
+
+    def install_exit_handlers(self):
+        """Stop running downloads when the script is terminated or its terminal closes (POSIX)"""
+        # spotdl runs in its own session, so it no longer dies with the terminal's process group
+        if os.name == 'nt':
+            return
+
+        def handle_exit(signum, frame):
+            self.stop_downloads()
+            sys.exit(128 + signum)
+
+        signal.signal(signal.SIGTERM, handle_exit)
+        signal.signal(signal.SIGHUP, handle_exit)
+
+    def download_track(self, track_url: str, track_id: Optional[str] = None):
         """Download a single Spotify track and keep retrying until it's present and tagged."""
         print(f"[*] Processing track: {track_url}")
-        track_info = self.get_track_info(track_url)
+        track_info = self.get_track_info(track_url, track_id)
         if not track_info:
             print("[*] Failed to get track information")
             return False
@@ -446,49 +700,32 @@ class AdvancedSpotifyDownloader:
             if expected_path.exists():
                 try:
                     self.sync_track_metadata(track_info, track_dir)
-                except Exception as e:
+                except OSError as e:
                     print(f"[*] Error tagging existing file: {e}")
                 print(f"[+] Track already present: {expected_path.name}")
                 return True
 
             print(f"[*] Download attempt #{attempt} for track: {track_info.get('title')}")
-            ok = self.download_with_spotdl(track_url, track_dir, timeout=300)
-
-            # After spotdl run, check for the expected file or any reasonable match
-            if expected_path.exists():
-                try:
-                    self.sync_track_metadata(track_info, track_dir)
-                except Exception as e:
-                    print(f"[*] Error tagging downloaded file: {e}")
-                print(f"[+] Successfully downloaded: {expected_path.name}")
-                return True
-
-            # Try a best-effort tagging even if filename differs (sync_track_metadata tries to match by content)
+            # Download into a private staging directory: concurrent jobs never see or rename each
+            # other's files, and matching only looks at what this run produced instead of the
+            # whole download folder. The tagged file is then renamed into place.
+            staging_dir = track_dir / f".dl-{uuid.uuid4().hex}"
+            staging_dir.mkdir()
             try:
-                self.sync_track_metadata(track_info, track_dir)
-            except Exception:
-                pass
-
-            # If spotdl reported success but file not found, still continue retrying per user request
-            if ok:
-                # maybe spotdl created a differently named file; check for any close match
-                candidates = list(track_dir.glob("*.mp3"))
-                if candidates:
-                    # if any file seems to match by normalization/duration, tag and return
-                    for f in candidates:
-                        try:
-                            audio = MP3(f)
-                            length = int(audio.info.length)
-                        except Exception:
-                            length = None
-                        target_len = int(track_info.get('duration_ms', 0) / 1000) if track_info.get('duration_ms') else None
-                        if target_len and length and abs(length - target_len) <= 3:
-                            try:
-                                self.sync_track_metadata(track_info, track_dir)
-                            except Exception:
-                                pass
-                            print(f"[+] Found likely match: {f.name}")
-                            return True
+                self.download_with_spotdl(track_url, staging_dir, timeout=300)
+                # Tag and rename to "Artist - Title.mp3" (matches by name, then by duration)
+                self.sync_track_metadata(track_info, staging_dir)
+                staged_path = staging_dir / expected_name
+                if staged_path.exists():
+                    # replace() rather than rename(): another job may have created the file
+                    # meanwhile, and Windows rename() would then fail and discard this download
+                    staged_path.replace(expected_path)
+                    print(f"[+] Successfully downloaded: {expected_path.name}")
+                    return True
+            except OSError as e:
+                print(f"[*] Error finalizing downloaded file: {e}")
+            finally:
+                shutil.rmtree(staging_dir, ignore_errors=True)
 
             print(f"[!] Attempt #{attempt} failed for: {track_info.get('title')}. Will retry...")
             attempt += 1
@@ -496,7 +733,7 @@ class AdvancedSpotifyDownloader:
 
     def identify_missing_tracks(self, album_info: Dict, directory: Path) -> List[Dict]:
         """Return list of track dicts that appear missing in the directory (no confident match)."""
-        files = list(directory.glob("*.mp3"))
+        files = self.list_audio_files(directory)
         # Precompute normalized filenames, durations, and tags
         file_data = []
         for f in files:
@@ -504,20 +741,18 @@ class AdvancedSpotifyDownloader:
             length = None
             tag_title = None
             tag_artist = None
+            audio = None
             try:
                 audio = MP3(f)
                 length = int(audio.info.length)
-            except Exception:
+            except (mutagen.MutagenError, OSError):
                 pass
             # try reading ID3 tags if available
-            try:
-                if audio.tags:
-                    if 'TIT2' in audio.tags:
-                        tag_title = self.normalize(str(audio.tags['TIT2']))
-                    if 'TPE1' in audio.tags:
-                        tag_artist = self.normalize(str(audio.tags['TPE1']))
-            except Exception:
-                pass
+            if audio is not None and audio.tags:
+                if 'TIT2' in audio.tags:
+                    tag_title = self.normalize(str(audio.tags['TIT2']))
+                if 'TPE1' in audio.tags:
+                    tag_artist = self.normalize(str(audio.tags['TPE1']))
             file_data.append({'path': f, 'norm': norm, 'length': length, 'tag_title': tag_title, 'tag_artist': tag_artist})
 
         missing = []
@@ -546,12 +781,12 @@ class AdvancedSpotifyDownloader:
                 missing.append(track)
         return missing
 
-    def download_album(self, album_url: str):
+    def download_album(self, album_url: str, album_id: Optional[str] = None):
         """Download an entire album using spotdl, then retry only failed tracks until complete."""
         print(f"[*] Processing album: {album_url}")
         
         # Get album info from Spotify (for display purposes)
-        album_info = self.get_album_info(album_url)
+        album_info = self.get_album_info(album_url, album_id)
         if not album_info:
             print("[*] Failed to get album information")
             return False
@@ -583,14 +818,10 @@ class AdvancedSpotifyDownloader:
                 break
 
             print(f"[*] Attempt #{attempt}: {len(missing)} missing track(s) will be retried.")
-            for track in missing:
-                # For each missing track, block and retry until it is detected
-                try:
-                    self.retry_track_until_downloaded(track, album_info, album_dir, timeout=300)
-                except Exception as e:
-                    print(f"[*] Error while retrying {track['title']}: {e}")
-                # small delay between track retries
-                time.sleep(1)
+            # Fetch every missing track in a single spotdl run instead of one process per track
+            track_urls = [f"https://open.spotify.com/track/{track['id']}" for track in missing]
+            self.download_with_spotdl(track_urls, album_dir, timeout=300 * len(missing))
+            self.sync_album_metadata(album_info, album_dir)
 
             attempt += 1
             # small pause before re-checking to avoid busy loop
@@ -601,12 +832,12 @@ class AdvancedSpotifyDownloader:
         print("[*] Album download and tagging completed!")
         return True
 
-    def download_playlist(self, playlist_url: str):
+    def download_playlist(self, playlist_url: str, playlist_id: Optional[str] = None):
         """Download an entire playlist using spotdl."""
         print(f"[*] Processing playlist: {playlist_url}")
         
         # Get playlist info from Spotify
-        playlist_info = self.get_playlist_info(playlist_url)
+        playlist_info = self.get_playlist_info(playlist_url, playlist_id)
         if not playlist_info:
             print("[*] Failed to get playlist information")
             return False
@@ -640,116 +871,127 @@ class AdvancedSpotifyDownloader:
         
         return True
 
-    def retry_track_until_downloaded(self, track: Dict, album_info: Dict, album_dir: Path, timeout: int = 300):
-        """Keep retrying download for one track until a confident match/file exists."""
-        expected_name = f"{self.sanitize_filename(track.get('artists') or album_info.get('artists'))} - {self.sanitize_filename(track['title'])}.mp3"
-        expected_path = album_dir / expected_name
-        track_url = f"https://open.spotify.com/track/{track['id']}"
-        attempt = 1
+    def process_url(self, url: str):
+        """Process a Spotify URL (track, album, or playlist)"""
+        # The type and ID are parsed once here and handed down, so the lookups don't re-parse the URL
+        match = SPOTIFY_URL_RE.search(url)
+        kind, spotify_id = match.groups() if match else (None, None)
+        if kind == 'track':
+            return self.download_track(url, spotify_id)
+        elif kind == 'album':
+            return self.download_album(url, spotify_id)
+        elif kind == 'playlist':
+            return self.download_playlist(url, spotify_id)
+        else:
+            print("[*] Unsupported Spotify URL. Please provide a track, album, or playlist link.")
+            return False
 
-        while True:
-            # If expected file already exists, tag and return
-            if expected_path.exists():
+    def process_batch(self, urls: Iterable[str]):
+        """Process URLs with a pool of worker threads fed through a bounded queue"""
+        # The queue only holds a couple of URLs per worker, so downloads start as soon as
+        # the first URL is read and huge lists are never held in memory
+        work = queue.Queue(maxsize=2 * self.jobs)
+
+        # Keys of URLs that are queued or downloading; a repeat of one of them (e.g. the same
+        # share link with a different ?si=) is skipped so two workers never download and rename
+        # the same files at once. Keys leave the set when done, so it never outgrows the queue.
+        pending_keys = set()
+        pending_lock = threading.Lock()
+
+        def worker():
+            while True:
+                item = work.get()
+                if item is None:
+                    return
+                key, url = item
                 try:
-                    tinfo = {
-                        'title': track['title'],
-                        'artists': track.get('artists') or album_info.get('artists'),
-                        'album': album_info.get('name'),
-                        'track_number': track.get('track_number'),
-                        'release_date': album_info.get('release_date'),
-                        'duration_ms': track.get('duration_ms'),
-                        'cover_url': album_info.get('cover_url')
-                    }
-                    self.sync_track_metadata(tinfo, album_dir)
-                except Exception:
-                    pass
-                print(f"[+] Track present: {expected_path.name}")
-                return True
+                    self.process_url(url)
+                except Exception as e:
+                    with self.print_lock:
+                        print(f"[*] Error processing {url}: {e}")
+                finally:
+                    with pending_lock:
+                        pending_keys.discard(key)
+                with self.print_lock:
+                    print(f"\n{'='*50}")
+                    print(f"[*] Finished: {url}")
+                    print(f"{'='*50}\n")
+
+        # Downloads are network-bound, so threads are enough to keep several in flight
+        workers = [threading.Thread(target=worker, daemon=True) for _ in range(self.jobs)]
+        for t in workers:
+            t.start()
 
-            print(f"[*] Retry attempt #{attempt} for: {track['title']}")
-            ok = self.download_with_spotdl(track_url, album_dir, timeout=timeout)
+        def shutdown():
+            for _ in workers:
+                work.put(None)
+            for t in workers:
+                while t.is_alive():
+                    t.join(0.5)  # timed join so Ctrl+C still gets through on Windows
 
-            # Always attempt to tag anything new (best-effort)
+        try:
             try:
-                tinfo = {
-                    'title': track['title'],
-                    'artists': track.get('artists') or album_info.get('artists'),
-                    'album': album_info.get('name'),
-                    'track_number': track.get('track_number'),
-                    'release_date': album_info.get('release_date'),
-                    'duration_ms': track.get('duration_ms'),
-                    'cover_url': track.get('cover_url')
-                }
-                self.sync_track_metadata(tinfo, album_dir)
+                for url in urls:
+                    match = SPOTIFY_URL_RE.search(url)
+                    key = match.groups() if match else url
+                    with pending_lock:
+                        duplicate = key in pending_keys
+                        pending_keys.add(key)
+                    if duplicate:
+                        with self.print_lock:
+                            print(f"[*] Skipping duplicate URL (already queued or downloading): {url}")
+                        continue
+                    work.put((key, url))
             except Exception:
-                pass
-
-            # If expected file now exists after tagging attempt
-            if expected_path.exists():
-                print(f"[+] Successfully downloaded: {expected_path.name}")
-                return True
-
-            # If spotdl reported success but filename differs, check for likely match by duration/normalization
-            if ok:
-                candidates = list(album_dir.glob("*.mp3"))
-                for f in candidates:
-                    try:
-                        audio = MP3(f)
-                        length = int(audio.info.length)
-                    except Exception:
-                        length = None
-                    target_len = int(track.get('duration_ms', 0) / 1000) if track.get('duration_ms') else None
-                    norm_name = self.normalize(f.stem)
-                    norm_title = self.normalize(track['title'])
-                    if (target_len and length and abs(length - target_len) <= 3) or (norm_title in norm_name or norm_name in norm_title):
-                        # Found likely match: tag and rename
-                        try:
-                            self.sync_track_metadata(tinfo, album_dir)
-                        except Exception:
-                            pass
-                        print(f"[+] Found likely match for {track['title']}: {f.name}")
-                        return True
-
-            # Otherwise, keep retrying indefinitely (per user request)
-            print(f"[!] Attempt #{attempt} failed for {track['title']}. Will retry...")
-            attempt += 1
-            time.sleep(2)
+                # Let already queued downloads finish before reporting a read error
+                shutdown()
+                raise
+            shutdown()
+        except KeyboardInterrupt:
+            # Drop queued URLs and kill running downloads; the workers are daemon threads,
+            # so they don't keep the process alive once the interrupt propagates
+            while True:
+                try:
+                    work.get_nowait()
+                except queue.Empty:
+                    break
+            self.stop_downloads()
+            raise
 
-    def process_url(self, url: str):
-        """Process a Spotify URL (track, album, or playlist)"""
-        if 'track' in url:
-            return self.download_track(url)
-        elif 'album' in url:
-            return self.download_album(url)
-        elif 'playlist' in url:
-            return self.download_playlist(url)
-        else:
-            print("[*] Unsupported Spotify URL. Please provide a track, album, or playlist link.")
-            return False
+def iter_urls(path: str) -> Iterator[str]:
+    """Yield URLs from a text file one at a time, skipping blank lines and # comments"""
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
 
 def main():
     parser = argparse.ArgumentParser(description='Advanced Spotify Downloader - MP3 320kbps Edition')
     parser.add_argument('url', nargs='?', help='Spotify track, album, or playlist URL')
     parser.add_argument('--file', '-f', help='Text file containing multiple Spotify URLs')
+    parser.add_argument('--jobs', '-j', type=int, default=4, help='Number of URLs from --file to download in parallel (default: 4)')
+    parser.add_argument('--refresh-meta', action='store_true', help='Ignore cached Spotify metadata and fetch it again')
+    parser.add_argument('--clear-cache', action='store_true', help='Delete all cached Spotify metadata')
     
     args = parser.parse_args()
     
-    downloader = AdvancedSpotifyDownloader()
+    downloader = AdvancedSpotifyDownloader(jobs=args.jobs, refresh_meta=args.refresh_meta)
+    downloader.install_exit_handlers()
+    
+    if args.clear_cache:
+        downloader.clear_cache()
+        if not (args.file or args.url):
+            return
     
     if args.file:
         # Process multiple URLs from a file
         try:
-            with open(args.file, 'r') as f:
-                urls = [line.strip() for line in f if line.strip()]
-            
-            for url in urls:
-                print(f"\n{'='*50}")
-                downloader.process_url(url)
-                print(f"{'='*50}\n")
+            downloader.process_batch(iter_urls(args.file))
                 
         except FileNotFoundError:
             print(f"[*] File not found: {args.file}")
-        except Exception as e:
+        except (OSError, UnicodeDecodeError) as e:
             print(f"[*] Error processing file: {e}")
     
     elif args.url: